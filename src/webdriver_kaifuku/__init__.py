@@ -1,53 +1,198 @@
 """Core functionality for starting, restarting, and stopping a selenium browser."""
 from __future__ import annotations
 
+import atexit
+import json
 import logging
-from copy import copy
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
 from typing import Callable
+from typing import cast
 from typing import ClassVar
+from typing import Hashable
+from typing import Iterable
+from typing import TYPE_CHECKING
 from urllib.error import URLError
-from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
 
 from attrs import define
 from attrs import field
-from selenium import webdriver
-from selenium.common.exceptions import UnexpectedAlertPresentException
-from selenium.common.exceptions import WebDriverException
-from selenium.webdriver.remote.file_detector import UselessFileDetector
-from selenium.webdriver.remote.webdriver import WebDriver
 
-from .tries import tries
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from selenium.webdriver.remote.webdriver import WebDriver
 
 log = logging.getLogger(__name__)
 
 
 THIRTY_SECONDS = 30
+REMOTE_POOL_MAXSIZE = 32
+# arguments sizing the window at launch, making maximize_window a wasted round-trip
+# --start-maximized is left out, it isn't honoured everywhere, e.g. by chrome in a container
+LAUNCH_SIZE_ARGUMENTS = ("--headless", "-headless", "--window-size=")
 
-BROWSER_ERRORS = URLError, WebDriverException
-TRUSTED_WEB_DRIVERS = [webdriver.Firefox, webdriver.Chrome, webdriver.Remote]
+
+def _trusted_web_drivers() -> list[type]:
+    """
+    Webdriver classes known to work, resolved lazily as importing selenium.webdriver is slow
+
+    The list is built once and published as :data:`TRUSTED_WEB_DRIVERS`, so additions by
+    users are honoured.
+    """
+    trusted = globals().get("TRUSTED_WEB_DRIVERS")
+    if trusted is None:
+        from selenium import webdriver
+
+        trusted = globals().setdefault(
+            "TRUSTED_WEB_DRIVERS", [webdriver.Firefox, webdriver.Chrome, webdriver.Remote]
+        )
+    return trusted
+
+
+@lru_cache(maxsize=None)
+def _browser_errors() -> tuple[type[Exception], ...]:
+    from selenium.common.exceptions import WebDriverException
+
+    return URLError, WebDriverException
+
+
+@lru_cache(maxsize=None)
+def _useless_file_detector() -> Any:
+    """
+    The file detector is stateless, so a single instance serves every browser
+    """
+    from selenium.webdriver.remote.file_detector import UselessFileDetector
+
+    return UselessFileDetector()
+
+
+@lru_cache(maxsize=None)
+def _shared_client_config(remote_server_addr: str, keep_alive: bool = True) -> Any:
+    """
+    Client config shared by all Remote drivers talking to the same server
+
+    Selenium defaults to a connection pool of one per driver, which causes reconnects as soon
+    as commands overlap. Returns None on selenium versions without ``ClientConfig``.
+    """
+    try:
+        from selenium.webdriver.remote.client_config import ClientConfig
+    except ImportError:
+        return None
+    return ClientConfig(
+        remote_server_addr=remote_server_addr,
+        keep_alive=keep_alive,
+        # selenium reads the pool manager kwargs from a nested key of the same name
+        init_args_for_pool_manager={
+            "init_args_for_pool_manager": {"maxsize": REMOTE_POOL_MAXSIZE, "block": False}
+        },
+    )
+
+
+def _retry_create(
+    create: Callable[[], WebDriver],
+    attempts: int = 2,
+    base: float = 0.5,
+    cap: float = 8.0,
+    budget: float = THIRTY_SECONDS,
+    quick: float = 0.2,
+) -> WebDriver:
+    """
+    Call ``create`` until it succeeds, sleeping with exponential backoff and jitter in between
+
+    The jitter spreads out retries of parallel workers hitting a saturated Selenium Grid.
+    A URLError means the server wasn't reached at all, that is retried after ``quick`` seconds.
+    No retry is started once it would end past ``budget`` seconds from the first attempt.
+    """
+    # ConnectionResetError includes http.client.RemoteDisconnected, common on a busy grid
+    retry_errors: tuple[type[BaseException], ...] = (*_browser_errors(), ConnectionResetError)
+    deadline = time.monotonic() + budget
+    for attempt in range(attempts):
+        try:
+            return create()
+        except retry_errors as e:
+            if isinstance(e, URLError):
+                delay = quick
+            else:
+                delay = min(cap, base * 2**attempt) + random.uniform(0, base)
+            if attempt == attempts - 1 or time.monotonic() + delay > deadline:
+                raise
+            log.warning("creating the browser failed (%s), retrying in %.1fs", e, delay)
+            time.sleep(delay)
+    raise ValueError("attempts must be at least 1")
+
+
+def _session_file() -> Path:
+    return Path(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), "wdk_session.json")
+
+
+def _reuse_session() -> bool:
+    return os.environ.get("WDK_REUSE_SESSION") == "1"
+
+
+def _process_alive(pid: Any) -> bool:
+    """
+    Whether the process owning a saved session still runs, unknown owners count as alive
+    """
+    if not isinstance(pid, int) or pid == os.getpid() or os.name == "nt":
+        # signal 0 is no liveness probe on windows, it would interrupt the process
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # e.g. permission denied, the process exists but belongs to someone else
+        return True
+    return True
+
+
+def __getattr__(name: str) -> Any:
+    # keep the selenium based constants importable without importing selenium upfront
+    if name == "TRUSTED_WEB_DRIVERS":
+        return _trusted_web_drivers()
+    if name == "BROWSER_ERRORS":
+        return _browser_errors()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _get_browser_name(webdriver_kwargs: dict, webdriver_name: str) -> str:
     """
     Extract the name of the browser from the browser config
     """
-    if webdriver_name.lower() == "remote":
-        name_from_options = (
-            webdriver_kwargs["options"].to_capabilities().get("browserName")
-            if "options" in webdriver_kwargs
-            else None
-        )
-        name_from_desired_capabilities = webdriver_kwargs.get("desired_capabilities", {}).get(
-            "browserName"
-        )
-        name = name_from_options or name_from_desired_capabilities
-    else:
+    name: str | None
+    if webdriver_name.lower() != "remote":
         name = webdriver_name
+    else:
+        # options.capabilities is read directly, to_capabilities() would serialize all of them
+        opts = webdriver_kwargs.get("options")
+        name = opts.capabilities.get("browserName") if opts is not None else None
+        if not name:
+            name = (webdriver_kwargs.get("desired_capabilities") or {}).get("browserName")
     if name:
         return name.lower()
     raise ValueError("No browser name specified")
 
 
+@lru_cache(maxsize=64)
+def _proxy_netloc(proxy_url: str) -> str:
+    """
+    Reduce a proxy url to the host:port the browsers expect
+
+    Bare ``host:port`` values are accepted too, urlparse would read the host as a scheme.
+    """
+    scheme, sep, rest = proxy_url.partition("://")
+    return (rest if sep else scheme).split("/", 1)[0]
+
+
 def _remove_deprecated_items(browser_conf: dict) -> dict:
     """
     Remove deprecated items from browser config
@@ -58,85 +203,427 @@ def _remove_deprecated_items(browser_conf: dict) -> dict:
         for i in deprecated_items:
             if i in opts["desired_capabilities"]:
                 log.warning(
-                    f"'{i}' capability has been deprecated in Selenium 4.10. "
-                    f"Remove it from your browser config"
+                    "'%s' capability has been deprecated in Selenium 4.10. "
+                    "Remove it from your browser config",
+                    i,
                 )
                 del browser_conf["webdriver_options"]["desired_capabilities"][i]
     return browser_conf
 
 
-@define(auto_attribs=True)
+class _FrozenOptions:
+    """
+    Selenium options inside a frozen config, compared by their current capabilities
+
+    Comparing by identity would hand out stale results once the caller changes the options.
+    """
+
+    __slots__ = ("options", "_key")
+
+    def __init__(self, options: Any) -> None:
+        self.options = options
+        self._key = (type(options), _freeze(options.to_capabilities()))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _FrozenOptions) and self._key == other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+
+def _freeze(value: Any) -> Any:
+    """
+    Turn a browser config into a hashable key, recursing into dicts and lists
+
+    Other values are tagged with their type, as True, 1 and 1.0 compare equal but e.g. firefox
+    treats bool and int preferences differently.
+    """
+    if isinstance(value, dict):
+        return (dict, tuple((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return (list, tuple(_freeze(v) for v in value))
+    if hasattr(value, "to_capabilities"):
+        return _FrozenOptions(value)
+    return (type(value), value)
+
+
+def _thaw(value: Any) -> Any:
+    """
+    Rebuild a fresh browser config from a key created by :func:`_freeze`
+    """
+    if isinstance(value, _FrozenOptions):
+        return value.options
+    value_type, value = value
+    if value_type is dict:
+        return {k: _thaw(v) for k, v in value}
+    if value_type is list:
+        return [_thaw(v) for v in value]
+    return value
+
+
+@lru_cache(maxsize=32)
+def _compile_conf(
+    manager_class: type[BrowserManager], frozen_conf: tuple, trusted: tuple[type, ...]
+) -> tuple[type, dict]:
+    """
+    Resolve the webdriver class and build the webdriver kwargs for a frozen browser config
+
+    ``trusted`` is a snapshot of :data:`TRUSTED_WEB_DRIVERS`, part of the key as it changes
+    the result. The result is shared between callers, use :func:`_copy_kwargs` before handing
+    it out.
+    """
+    from selenium import webdriver
+
+    browser_conf = _remove_deprecated_items(_thaw(frozen_conf))
+
+    log.debug("browser config: %r", browser_conf)
+    webdriver_name = browser_conf.get("webdriver", "Chrome").title()
+    webdriver_class = getattr(webdriver, webdriver_name)
+
+    if webdriver_class not in trusted:
+        log.warning("Untrusted webdriver %s, may cause failure.", webdriver_name)
+
+    webdriver_kwargs = browser_conf.get("webdriver_options", {})
+    browser_name = _get_browser_name(webdriver_kwargs, webdriver_name)
+
+    if "proxy_url" in browser_conf:
+        browser_conf["proxy_url"] = _proxy_netloc(browser_conf["proxy_url"])
+    if browser_name == "chrome":
+        opts = manager_class._config_options_for_chrome(browser_conf)
+        if webdriver_class == webdriver.Remote:
+            _add_arguments(opts, ["--no-sandbox"])
+        webdriver_kwargs["options"] = opts
+    if browser_name == "firefox":
+        webdriver_kwargs["options"] = manager_class._config_options_for_firefox(browser_conf)
+
+    if webdriver_class in trusted and "command_executor" in browser_conf:
+        webdriver_kwargs["command_executor"] = browser_conf["command_executor"]
+    return webdriver_class, webdriver_kwargs
+
+
+def _own_options(browser_conf: dict, options_class: type) -> Any:
+    """
+    Get a private copy of the configured options, so extending them leaves the caller's alone
+    """
+    opts = browser_conf.get("webdriver_options", {}).get("options")
+    return options_class() if opts is None else deepcopy(opts)
+
+
+def _add_arguments(opts: Any, arguments: Iterable[str]) -> None:
+    """
+    Add the arguments missing from the options, in order and without duplicates
+    """
+    existing = set(opts.arguments)
+    for arg in arguments:
+        if arg not in existing:
+            existing.add(arg)
+            opts.add_argument(arg)
+
+
+def _copy_kwargs(webdriver_kwargs: dict) -> dict:
+    """
+    Copy compiled webdriver kwargs so changes by the caller or selenium can't poison the cache
+    """
+    return deepcopy(webdriver_kwargs)
+
+
+@define(auto_attribs=True, eq=False)
 class BrowserFactory:
-    ALLOWED_KWARGS: ClassVar[list[str]] = ["command_executor", "options", "keep_alive"]
+    ALLOWED_KWARGS: ClassVar[list[str]] = [
+        "command_executor",
+        "options",
+        "keep_alive",
+        "client_config",
+    ]
     webdriver_class: type
     webdriver_kwargs: dict
 
     def processed_browser_args(self):
-        return {k: v for k, v in self.webdriver_kwargs.items() if k in self.ALLOWED_KWARGS}
+        from selenium import webdriver
+
+        args = {k: v for k, v in self.webdriver_kwargs.items() if k in self.ALLOWED_KWARGS}
+        command_executor = args.get("command_executor")
+        if (
+            self.webdriver_class is webdriver.Remote
+            and isinstance(command_executor, str)
+            and "client_config" not in args
+        ):
+            client_config = _shared_client_config(command_executor, args.get("keep_alive", True))
+            if client_config is not None:
+                args["client_config"] = client_config
+        return args
 
     def create(self) -> WebDriver:
+        args = self.processed_browser_args()
         try:
-            browser = tries(
-                2,
-                WebDriverException,
-                self.webdriver_class,
-                **self.processed_browser_args(),
-            )
+            browser = _retry_create(lambda: self.webdriver_class(**args))
         except URLError as e:
-            if e.reason.errno == 111:  # type: ignore
+            if getattr(e.reason, "errno", None) == 111:
                 # Known issue
                 raise RuntimeError("Could not connect to Selenium server. Is it up and running?")
             else:
                 # Unknown issue
                 raise
 
-        browser.file_detector = UselessFileDetector()
-        browser.maximize_window()
+        browser.file_detector = _useless_file_detector()
+        if not self._sized_at_launch():
+            browser.maximize_window()
         return browser
 
+    def _sized_at_launch(self) -> bool:
+        """
+        Whether the window size is fixed by the arguments, making maximize_window a wasted call
+        """
+        arguments = getattr(self.webdriver_kwargs.get("options"), "arguments", ())
+        return any(arg.startswith(LAUNCH_SIZE_ARGUMENTS) for arg in arguments)
+
     def close(self, browser: WebDriver | None) -> None:
         if browser:
             browser.quit()
 
+    def save_session(self, browser: WebDriver) -> None:
+        """
+        Remember the session of a Remote browser so a later run can reattach to it
+
+        The session id is enough to take over the browser, so the file is private to the user.
+        """
+        command_executor = self.processed_browser_args().get("command_executor")
+        if not isinstance(command_executor, str) or browser.session_id is None:
+            return
+        session = {
+            "session_id": browser.session_id,
+            "command_executor": command_executor,
+            "capabilities": browser.caps,
+            "owner_pid": os.getpid(),
+        }
+        path = _session_file()
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(session, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError):
+            log.warning("could not save the browser session", exc_info=True)
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def _claim_session(self, command_executor: str) -> dict | None:
+        """
+        Take the saved session out of the session file, if it is free for this factory
+
+        Sessions whose owning process still runs, including this one, are left alone.
+        Renaming the file away makes sure only one of several contenders gets it.
+        """
+        path = _session_file()
+        try:
+            session = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if not self._session_is_free(session, command_executor):
+            return None
+        claimed = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.claimed")
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            return None
+        try:
+            session = json.loads(claimed.read_text())
+        except (OSError, ValueError):
+            session = {}
+        if not self._session_is_free(session, command_executor):
+            # the file was replaced in between, hand it back to its owner
+            try:
+                os.replace(claimed, path)
+            except OSError:
+                log.warning("could not hand back the browser session file", exc_info=True)
+            return None
+        claimed.unlink()
+        return session
 
-@define(auto_attribs=True)
+    @staticmethod
+    def _session_is_free(session: dict, command_executor: str) -> bool:
+        return session.get("command_executor") == command_executor and not _process_alive(
+            session.get("owner_pid")
+        )
+
+    def reattach(self) -> WebDriver | None:
+        """
+        Reattach to the session saved by :meth:`save_session` if it is still alive
+        """
+        from selenium import webdriver
+
+        args = self.processed_browser_args()
+        command_executor = args.get("command_executor")
+        if (
+            self.webdriver_class is not webdriver.Remote
+            or "options" not in args
+            or not isinstance(command_executor, str)
+        ):
+            return None
+        claimed = self._claim_session(command_executor)
+        if claimed is None:
+            return None
+        session: dict = claimed
+
+        class ReattachedRemote(webdriver.Remote):
+            def start_session(self, capabilities: dict) -> None:
+                # reuse the running session instead of requesting a new one
+                self.session_id = session["session_id"]
+                self.caps = session.get("capabilities") or capabilities
+
+        try:
+            browser = ReattachedRemote(**args)
+            browser.current_url
+        except Exception:
+            log.info("saved browser session is gone, starting a new one")
+            return None
+        log.info("reattached to browser session %s", browser.session_id)
+        browser.file_detector = _useless_file_detector()
+        return browser
+
+    @property
+    def pool_key(self) -> tuple:
+        """
+        Key under which browsers created by this factory are pooled
+
+        Options are compared by their capabilities, as each manager holds its own copy.
+        """
+        args = self.processed_browser_args()
+        if "options" in args:
+            args["options"] = args["options"].to_capabilities()
+        return self.webdriver_class, _freeze(args)
+
+
+@define(auto_attribs=True, eq=False)
+class BrowserPool:
+    """
+    Process wide pool of idle browsers, reused instead of starting a new one
+
+    A ``max_size`` of 0 disables pooling and browsers are quit as usual.
+    """
+
+    max_size: int
+    _idle: deque = field(factory=deque, init=False)
+    _lock: threading.Lock = field(factory=threading.Lock, init=False)
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def acquire(self, factory: BrowserFactory) -> WebDriver | None:
+        if not self.max_size:
+            return None
+        key = factory.pool_key
+        while True:
+            with self._lock:
+                for index, (idle_key, browser) in enumerate(self._idle):
+                    if idle_key == key:
+                        del self._idle[index]
+                        break
+                else:
+                    return None
+            try:
+                browser.current_url
+            except Exception:
+                log.warning("pooled browser is dead, discarding it", exc_info=True)
+                self._quit(browser)
+            else:
+                return browser
+
+    def release(self, factory: BrowserFactory, browser: WebDriver | None) -> bool:
+        """
+        Reset the browser and keep it for reuse, returns False if the caller has to close it
+        """
+        if browser is None or len(self._idle) >= self.max_size:
+            return False
+        try:
+            # stop pending loads first, so they can't set cookies or navigate after the reset
+            browser.execute_script("window.stop();")
+            browser.delete_all_cookies()
+            browser.get("about:blank")
+            if browser.current_url != "about:blank":
+                raise RuntimeError(f"browser is stuck on {browser.current_url}")
+        except Exception:
+            log.warning("could not reset browser for reuse", exc_info=True)
+            return False
+        key = factory.pool_key
+        with self._lock:
+            if len(self._idle) >= self.max_size:
+                return False
+            self._idle.append((key, browser))
+        return True
+
+    def shutdown(self) -> None:
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for _, browser in idle:
+            self._quit(browser)
+
+    def forget(self) -> None:
+        """
+        Drop the idle browsers without quitting them, they belong to another process after fork
+        """
+        self._lock = threading.Lock()
+        self._idle.clear()
+
+    @staticmethod
+    def _quit(browser: WebDriver) -> None:
+        try:
+            browser.quit()
+        except Exception:
+            log.exception("An exception happened during pooled browser shutdown:")
+
+
+# cleanup callbacks per browser, entries go away with the browser
+_CLEANUPS: WeakKeyDictionary[WebDriver, list[Callable]] = WeakKeyDictionary()
+
+BROWSER_POOL = BrowserPool(int(os.environ.get("WDK_POOL_MAX", "0")))
+atexit.register(BROWSER_POOL.shutdown)
+if hasattr(os, "register_at_fork"):
+    # a forked child must neither reuse nor quit the sessions of its parent
+    os.register_at_fork(after_in_child=BROWSER_POOL.forget)
+
+
+@define(auto_attribs=True, eq=False)
 class BrowserManager:
+    # how long a browser counts as alive after it last answered, without asking it again
+    ALIVE_CHECK_INTERVAL: ClassVar[float] = 0.25
     browser_factory: BrowserFactory
     browser: WebDriver | None = field(default=None, init=False)
+    _last_ok_monotonic: float = field(default=0.0, init=False)
 
     @staticmethod
     def _config_options_for_chrome(browser_conf: dict) -> webdriver.ChromeOptions:
-        opts = browser_conf.get("webdriver_options", {}).get("options", webdriver.ChromeOptions())
+        from selenium import webdriver
+
+        opts = _own_options(browser_conf, webdriver.ChromeOptions)
         chrome_options = browser_conf.get("webdriver_options", {}).get("desired_capabilities", {})
         additional_chrome_opts = chrome_options.pop("chromeOptions", {})
 
-        chrome_args = additional_chrome_opts.get("args", [])
-        if chrome_args:
-            for arg in chrome_args:
-                if arg not in opts.arguments:
-                    opts.add_argument(arg)
+        chrome_args = list(additional_chrome_opts.get("args", []))
         if "proxy_url" in browser_conf:
-            opts.add_argument(f"--proxy-server={browser_conf['proxy_url']}")
+            chrome_args.append(f"--proxy-server={browser_conf['proxy_url']}")
+        _add_arguments(opts, chrome_args)
         for key, value in chrome_options.items():
             opts.set_capability(key, value)
         return opts
 
     @staticmethod
     def _config_options_for_firefox(browser_conf: dict) -> webdriver.FirefoxOptions:
-        opts = browser_conf.get("webdriver_options", {}).get("options", webdriver.FirefoxOptions())
+        from selenium import webdriver
+
+        opts = _own_options(browser_conf, webdriver.FirefoxOptions)
         firefox_options = browser_conf.get("webdriver_options", {}).get("desired_capabilities", {})
         additional_firefox_opts = firefox_options.pop("firefoxOptions", {})
 
-        firefox_args = additional_firefox_opts.get("args", [])
-        if firefox_args:
-            for arg in firefox_args:
-                if arg not in opts.arguments:
-                    opts.add_argument(arg)
+        _add_arguments(opts, additional_firefox_opts.get("args", []))
 
         firefox_prefs = additional_firefox_opts.get("prefs", {})
         for pref, value in firefox_prefs.items():
-            if pref not in opts.arguments:
-                opts.set_preference(pref, value)
+            opts.set_preference(pref, value)
 
         for key, value in firefox_options.items():
             opts.set_capability(key, value)
@@ -153,40 +640,31 @@ class BrowserManager:
 
     @classmethod
     def from_conf(cls, browser_conf: dict) -> BrowserManager:
-        browser_conf = copy(browser_conf)
-        browser_conf = _remove_deprecated_items(browser_conf)
-
-        log.debug(browser_conf)
-        webdriver_name = browser_conf.get("webdriver", "Chrome").title()
-        webdriver_class = getattr(webdriver, webdriver_name)
-
-        if webdriver_class not in TRUSTED_WEB_DRIVERS:
-            log.warning(f"Untrusted webdriver {webdriver_name}, may cause failure.")
-
-        webdriver_kwargs = browser_conf.get("webdriver_options", {})
-        browser_name = _get_browser_name(webdriver_kwargs, webdriver_name)
-
-        if "proxy_url" in browser_conf:
-            parsed_url = urlparse(browser_conf["proxy_url"])
-            proxy_netloc = parsed_url.netloc or parsed_url.path
-            browser_conf["proxy_url"] = proxy_netloc
-        if browser_name == "chrome":
-            opts = cls._config_options_for_chrome(browser_conf)
-            if webdriver_class == webdriver.Remote:
-                opts.add_argument("--no-sandbox")
-            webdriver_kwargs["options"] = opts
-        if browser_name == "firefox":
-            webdriver_kwargs["options"] = cls._config_options_for_firefox(browser_conf)
-
-        if webdriver_class in TRUSTED_WEB_DRIVERS and "command_executor" in browser_conf:
-            webdriver_kwargs["command_executor"] = browser_conf["command_executor"]
-        return cls(BrowserFactory(webdriver_class, webdriver_kwargs))
+        frozen_conf = _freeze(browser_conf)
+        trusted = tuple(_trusted_web_drivers())
+        try:
+            hash(frozen_conf)
+        except TypeError:
+            # unhashable values in the config, build it without the cache
+            webdriver_class, webdriver_kwargs = _compile_conf.__wrapped__(
+                cls, frozen_conf, trusted
+            )
+        else:
+            # mypy reads the attrs generated __hash__ of the class as its own
+            manager_class = cast(Hashable, cls)
+            webdriver_class, webdriver_kwargs = _compile_conf(manager_class, frozen_conf, trusted)
+        return cls(BrowserFactory(webdriver_class, _copy_kwargs(webdriver_kwargs)))
 
     @property
     def is_alive(self) -> bool:
-        log.debug("alive check")
         if self.browser is None:
             return False
+        if time.monotonic() - self._last_ok_monotonic < self.ALIVE_CHECK_INTERVAL:
+            return True
+        from selenium.common.exceptions import UnexpectedAlertPresentException
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("alive check")
         try:
             self.browser.current_url
         except UnexpectedAlertPresentException:
@@ -195,8 +673,15 @@ class BrowserManager:
         except Exception:
             log.exception("browser in unknown state, considering dead")
             return False
+        self.touch()
         return True
 
+    def touch(self) -> None:
+        """
+        Record that the browser just answered a command, sparing the next alive check
+        """
+        self._last_ok_monotonic = time.monotonic()
+
     def ensure_open(self) -> WebDriver:
         if self.is_alive:
             # typeguard as is_alive will not communicate as type guard
@@ -207,41 +692,71 @@ class BrowserManager:
 
     def add_cleanup(self, callback: Callable) -> None:
         assert self.browser is not None
-        try:
-            cl = self.browser.__cleanup  # type: ignore
-        except AttributeError:
-            cl = self.browser.__cleanup = []  # type: ignore
-        cl.append(callback)
-
-    def _consume_cleanups(self) -> None:
-        try:
-            cl = self.browser.__cleanup  # type: ignore
-        except AttributeError:
-            pass
-        else:
-            while cl:
-                cl.pop()()
+        _CLEANUPS.setdefault(self.browser, []).append(callback)
 
-    def close(self) -> None:
-        self._consume_cleanups()
+    def close(self, pool: bool = True) -> None:
+        """
+        Run the cleanups and give the browser back to the pool, or quit it with ``pool=False``
+        """
+        if self.browser is not None:
+            for callback in reversed(_CLEANUPS.pop(self.browser, [])):
+                try:
+                    callback()
+                except Exception:
+                    log.exception("An exception happened during a browser cleanup:")
         try:
-            self.browser_factory.close(self.browser)
-        except Exception as e:
-            log.error("An exception happened during browser shutdown:")
-            log.exception(e)
+            if not (pool and BROWSER_POOL.release(self.browser_factory, self.browser)):
+                self.browser_factory.close(self.browser)
+        except Exception:
+            log.exception("An exception happened during browser shutdown:")
         finally:
             self.browser = None
+            self._last_ok_monotonic = 0.0
 
     quit = close
 
     def start(self) -> WebDriver:
         if self.browser is not None:
-            self.quit()
+            # a restart has to get rid of the browser, not recycle it through the pool
+            self.close(pool=False)
         return self.open_fresh()
 
+    def warmup(self, n: int) -> int:
+        """
+        Start up to ``n`` browsers in parallel and park them in :data:`BROWSER_POOL`
+
+        Browser startup mostly waits on the driver or grid, so threads overlap it well.
+        Returns the number of browsers added to the pool.
+        """
+        n = min(n, BROWSER_POOL.max_size - len(BROWSER_POOL))
+        if n <= 0:
+            return 0
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            futures = [executor.submit(self.browser_factory.create) for _ in range(n)]
+        added = 0
+        for future in futures:
+            try:
+                browser = future.result()
+            except Exception:
+                log.exception("An exception happened while warming up a browser:")
+                continue
+            if BROWSER_POOL.release(self.browser_factory, browser):
+                added += 1
+            else:
+                self.browser_factory.close(browser)
+        return added
+
     def open_fresh(self) -> WebDriver:
         log.info("starting browser")
         assert self.browser is None
 
-        self.browser = self.browser_factory.create()
+        browser = BROWSER_POOL.acquire(self.browser_factory)
+        if browser is None and _reuse_session():
+            browser = self.browser_factory.reattach() or self.browser_factory.create()
+            # this process owns the session now, record it for the next run
+            self.browser_factory.save_session(browser)
+        if browser is None:
+            browser = self.browser_factory.create()
+        self.browser = browser
+        self.touch()
         return self.browser
@@ -24,12 +24,9 @@ def tries(num_tries, exceptions, f, *args, **kwargs):
         What ``f`` raises if the try count is exceeded.
     """
     caught_exception = TriesExceeded("Tries were exhausted without a specific function exception")
-    used_tries = 0
-    while used_tries < num_tries:
-        used_tries += 1
+    for _ in range(num_tries):
         try:
             return f(*args, **kwargs)
         except exceptions as e:
             caught_exception = e
-    else:
-        raise caught_exception
+    raise caught_exception
@@ -1,5 +1,6 @@
 import contextlib
 import subprocess
+import time
 from urllib.request import urlopen
 
 import pytest
@@ -8,6 +9,7 @@ from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from wait_for import wait_for
 
 BROWSER_IMAGE = "quay.io/redhatqe/selenium-standalone:latest"
+PODMAN_RUN_ATTEMPTS = 3
 
 _CHROME_OPTIONS = ChromeOptions()
 _CHROME_OPTIONS.set_capability("acceptInsecureCerts", True)
@@ -105,27 +107,40 @@ CONFIGS = [
 
 @pytest.fixture(scope="session")
 def selenium_container():
-    ps = subprocess.run(
-        [
-            "podman",
-            "run",
-            "--rm",
-            "-d",
-            "-p",
-            "127.0.0.1:4444:4444",
-            "--shm-size=2g",
-            BROWSER_IMAGE,
-        ],
-        capture_output=True,
+    for attempt in range(PODMAN_RUN_ATTEMPTS):
+        ps = subprocess.run(
+            [
+                "podman",
+                "run",
+                "--rm",
+                "-d",
+                "-p",
+                "127.0.0.1:4444:4444",
+                "--shm-size=2g",
+                BROWSER_IMAGE,
+            ],
+            capture_output=True,
+        )
+        if ps.returncode == 0:
+            break
+        if attempt < PODMAN_RUN_ATTEMPTS - 1:
+            time.sleep(2**attempt)
+    else:
+        pytest.fail(f"could not start {BROWSER_IMAGE}: {ps.stderr.decode('utf-8')}")
+    wait_for(
+        lambda: urlopen("http://127.0.0.1:4444"),
+        timeout=180,
+        # wait_for has no cap on the exponential delay, poll at a short fixed interval instead
+        delay=0.5,
+        handle_exception=True,
     )
-    wait_for(lambda: urlopen("http://127.0.0.1:4444"), timeout=180, handle_exception=True)
     container_id = ps.stdout.decode("utf-8").strip()
     yield container_id
-    subprocess.run(["podman", "kill", container_id], stdout=subprocess.DEVNULL)
+    subprocess.run(["podman", "stop", "-t", "2", container_id], stdout=subprocess.DEVNULL)
 
 
-@pytest.fixture(params=CONFIGS)
-def test_data(selenium_container, request: pytest.FixtureRequest):
+@pytest.fixture(scope="session", params=CONFIGS)
+def session_test_data(selenium_container, request: pytest.FixtureRequest):
     from webdriver_kaifuku import BrowserManager, log
 
     config, browser_name = request.param  # type: ignore
@@ -134,3 +149,13 @@ def test_data(selenium_container, request: pytest.FixtureRequest):
     log.warning(mgr)
     with contextlib.closing(mgr) as mgr:
         yield mgr, browser_name
+
+
+@pytest.fixture
+def test_data(session_test_data):
+    # the browser stays open for the next test of the same config, only its cookies are reset
+    yield session_test_data
+    mgr, _ = session_test_data
+    if mgr.is_alive:
+        assert mgr.browser is not None
+        mgr.browser.delete_all_cookies()
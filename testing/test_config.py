@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+from copy import deepcopy
+
 import pytest
+import webdriver_kaifuku
+from selenium import webdriver
+from selenium.webdriver import ChromeOptions
+from webdriver_kaifuku import _compile_conf
 from webdriver_kaifuku import BrowserManager
 
 
@@ -54,3 +60,153 @@ def test_initializing_from_config(conf: dict, browser_name: str):
     assert options.arguments == ["foo"]
     if browser_name == "firefox":
         assert options.preferences == {"bar": False}
+
+
+@pytest.mark.parametrize("conf,browser_name", CONFIGS)
+def test_from_conf_reuses_compiled_config(conf: dict, browser_name: str):
+    original = deepcopy(conf)
+    first = BrowserManager.from_conf(conf).browser_factory.webdriver_kwargs
+    hits = _compile_conf.cache_info().hits
+    second = BrowserManager.from_conf(conf).browser_factory.webdriver_kwargs
+
+    assert _compile_conf.cache_info().hits == hits + 1
+    assert conf == original
+    assert first["options"] is not second["options"]
+    assert first["options"].to_capabilities() == second["options"].to_capabilities()
+    assert first["desired_capabilities"] is not second["desired_capabilities"]
+
+
+def test_from_conf_tells_bool_from_int_prefs():
+    def prefs(value):
+        conf = {
+            "webdriver": "firefox",
+            "webdriver_options": {
+                "desired_capabilities": {"firefoxOptions": {"prefs": {"x": value}}},
+            },
+        }
+        options = BrowserManager.from_conf(conf).browser_factory.webdriver_kwargs["options"]
+        return options.preferences["x"]
+
+    assert prefs(1) == 1
+    assert prefs(True) is True
+    assert prefs(1.0) == 1.0 and isinstance(prefs(1.0), float)
+
+
+def test_from_conf_picks_up_changed_options():
+    options = ChromeOptions()
+    conf = {"webdriver": "chrome", "webdriver_options": {"options": options}}
+    BrowserManager.from_conf(conf)
+
+    options.add_argument("--headless=new")
+    options.set_capability("acceptInsecureCerts", True)
+    changed = BrowserManager.from_conf(conf).browser_factory.webdriver_kwargs["options"]
+
+    assert "--headless=new" in changed.arguments
+    assert changed.capabilities.get("acceptInsecureCerts") is True
+
+
+def test_remote_drivers_share_client_config():
+    conf = {
+        "webdriver": "Remote",
+        "webdriver_options": {
+            "command_executor": "http://127.0.0.1:4444",
+            "desired_capabilities": {"browserName": "chrome"},
+        },
+    }
+    first = BrowserManager.from_conf(conf).browser_factory.processed_browser_args()
+    second = BrowserManager.from_conf(conf).browser_factory.processed_browser_args()
+
+    assert first["client_config"] is second["client_config"]
+    assert first["client_config"].remote_server_addr == "http://127.0.0.1:4444"
+
+
+def test_processed_args_follow_changed_kwargs():
+    conf = {
+        "webdriver": "Remote",
+        "webdriver_options": {
+            "command_executor": "http://127.0.0.1:4444",
+            "desired_capabilities": {"browserName": "chrome"},
+        },
+    }
+    factory = BrowserManager.from_conf(conf).browser_factory
+    factory.webdriver_kwargs["command_executor"] = "http://127.0.0.1:5555"
+    args = factory.processed_browser_args()
+
+    assert args["command_executor"] == "http://127.0.0.1:5555"
+    assert args["client_config"].remote_server_addr == "http://127.0.0.1:5555"
+
+
+def test_from_conf_leaves_options_alone():
+    options = ChromeOptions()
+    options.add_argument("foo")
+    conf = {
+        "webdriver": "Remote",
+        "proxy_url": "http://example.com:8080",
+        "webdriver_options": {"command_executor": "http://127.0.0.1:4444", "options": options},
+    }
+    manager = BrowserManager.from_conf(conf)
+
+    assert options.arguments == ["foo"]
+    assert manager.browser_factory.webdriver_kwargs["options"].arguments == [
+        "foo",
+        "--proxy-server=example.com:8080",
+        "--no-sandbox",
+    ]
+
+
+@pytest.mark.parametrize(
+    "browser_name,arguments,sized",
+    [
+        ("firefox", [], False),
+        ("firefox", ["-headless"], True),
+        ("chrome", [], False),
+        ("chrome", ["--start-maximized"], False),
+        ("chrome", ["--window-size=800,600"], True),
+    ],
+)
+def test_window_size_fixed_at_launch(browser_name: str, arguments: list, sized: bool):
+    conf = {
+        "webdriver": browser_name,
+        "webdriver_options": {
+            "desired_capabilities": {f"{browser_name}Options": {"args": arguments}},
+        },
+    }
+    factory = BrowserManager.from_conf(conf).browser_factory
+
+    assert factory.webdriver_kwargs["options"].arguments == arguments
+    assert factory._sized_at_launch() is sized
+
+
+def test_remote_chrome_no_sandbox_added_once():
+    options = ChromeOptions()
+    options.add_argument("--no-sandbox")
+    conf = {
+        "webdriver": "Remote",
+        "webdriver_options": {"command_executor": "http://127.0.0.1:4444", "options": options},
+    }
+    manager = BrowserManager.from_conf(conf)
+
+    assert manager.browser_factory.webdriver_kwargs["options"].arguments == ["--no-sandbox"]
+
+
+@pytest.mark.parametrize(
+    "proxy_url", ["http://example.com:8080", "http://example.com:8080/", "example.com:8080"]
+)
+def test_proxy_url_reduced_to_netloc(proxy_url: str):
+    conf = {"webdriver": "chrome", "proxy_url": proxy_url}
+    options = BrowserManager.from_conf(conf).browser_factory.webdriver_kwargs["options"]
+
+    assert options.arguments == ["--proxy-server=example.com:8080"]
+
+
+def test_trusted_web_drivers_can_be_extended():
+    conf = {"webdriver": "Edge", "command_executor": "http://127.0.0.1:4444"}
+    assert "command_executor" not in BrowserManager.from_conf(conf).browser_factory.webdriver_kwargs
+
+    webdriver_kaifuku.TRUSTED_WEB_DRIVERS.append(webdriver.Edge)
+    try:
+        kwargs = BrowserManager.from_conf(conf).browser_factory.webdriver_kwargs
+    finally:
+        webdriver_kaifuku.TRUSTED_WEB_DRIVERS.remove(webdriver.Edge)
+
+    assert kwargs["command_executor"] == "http://127.0.0.1:4444"
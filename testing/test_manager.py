@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from webdriver_kaifuku import BrowserFactory
+from webdriver_kaifuku import BrowserManager
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.current_url = "http://example.com"
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_cleanups_all_run_on_close():
+    manager = BrowserManager(BrowserFactory(FakeBrowser, {}))
+    manager.browser = browser = FakeBrowser()
+    calls = []
+    manager.add_cleanup(lambda: calls.append(1))
+    manager.add_cleanup(lambda: 1 / 0)
+    manager.add_cleanup(lambda: calls.append(2))
+
+    manager.close()
+
+    assert calls == [2, 1]
+    assert browser.quit_called
+    assert manager.browser is None
+
+
+def test_is_alive_skips_probe_after_recent_answer():
+    manager = BrowserManager(BrowserFactory(FakeBrowser, {}))
+    manager.browser = browser = FakeBrowser()
+    assert manager.is_alive
+
+    del browser.current_url  # any further probe would fail
+    assert manager.is_alive
+    manager._last_ok_monotonic = 0.0
+    assert not manager.is_alive
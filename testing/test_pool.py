@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import webdriver_kaifuku
+from webdriver_kaifuku import BrowserFactory
+from webdriver_kaifuku import BrowserManager
+from webdriver_kaifuku import BrowserPool
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.current_url = "http://example.com"
+        self.quit_called = False
+
+    def execute_script(self, script):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        self.current_url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeFactory(BrowserFactory):
+    def create(self):
+        return FakeBrowser()
+
+
+def test_pool_reuses_released_browser():
+    pool = BrowserPool(1)
+    factory = BrowserFactory(FakeBrowser, {})
+    browser = FakeBrowser()
+
+    assert pool.acquire(factory) is None
+    assert pool.release(factory, browser)
+    assert not pool.release(factory, FakeBrowser())
+    assert pool.acquire(factory) is browser
+    assert browser.current_url == "about:blank"
+    assert pool.acquire(factory) is None
+
+
+def test_pool_disabled_and_shutdown():
+    factory = BrowserFactory(FakeBrowser, {})
+    browser = FakeBrowser()
+    assert not BrowserPool(0).release(factory, browser)
+
+    pool = BrowserPool(2)
+    pool.release(factory, browser)
+    pool.shutdown()
+    assert browser.quit_called
+    assert pool.acquire(factory) is None
+
+
+def test_warmup_fills_pool(monkeypatch):
+    pool = BrowserPool(2)
+    monkeypatch.setattr(webdriver_kaifuku, "BROWSER_POOL", pool)
+    manager = BrowserManager(FakeFactory(FakeBrowser, {}))
+
+    assert manager.warmup(5) == 2
+    assert len(pool) == 2
+    assert manager.warmup(1) == 0
+
+
+def test_forget_leaves_browsers_running():
+    factory = BrowserFactory(FakeBrowser, {})
+    browser = FakeBrowser()
+    pool = BrowserPool(1)
+    pool.release(factory, browser)
+
+    pool.forget()
+
+    assert len(pool) == 0
+    assert not browser.quit_called
+
+
+def test_start_quits_instead_of_pooling(monkeypatch):
+    pool = BrowserPool(2)
+    monkeypatch.setattr(webdriver_kaifuku, "BROWSER_POOL", pool)
+    manager = BrowserManager(FakeFactory(FakeBrowser, {}))
+    first = manager.start()
+
+    second = manager.start()
+
+    assert second is not first
+    assert first.quit_called
+    assert len(pool) == 0
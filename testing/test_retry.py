@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import time
+from urllib.error import URLError
+
+import pytest
+import webdriver_kaifuku
+from selenium.common.exceptions import WebDriverException
+from webdriver_kaifuku import BrowserFactory
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    monkeypatch.setattr(webdriver_kaifuku.random, "uniform", lambda a, b: b)
+    return sleeps
+
+
+def failing(*errors, result="browser"):
+    errors = list(errors)
+
+    def create():
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return create
+
+
+def test_retry_create_backs_off_with_jitter(sleeps):
+    create = failing(WebDriverException("busy"), WebDriverException("busy"))
+
+    assert webdriver_kaifuku._retry_create(create, attempts=3, base=0.5) == "browser"
+    assert sleeps == [0.5 + 0.5, 1.0 + 0.5]
+
+
+def test_retry_create_caps_the_delay(sleeps):
+    create = failing(*[WebDriverException("busy")] * 3)
+
+    webdriver_kaifuku._retry_create(create, attempts=4, base=2.0, cap=3.0, budget=60)
+    assert sleeps == [2.0 + 2.0, 3.0 + 2.0, 3.0 + 2.0]
+
+
+def test_retry_create_gives_up_on_last_attempt(sleeps):
+    create = failing(WebDriverException("first"), WebDriverException("last"))
+
+    with pytest.raises(WebDriverException, match="last"):
+        webdriver_kaifuku._retry_create(create, attempts=2)
+    assert len(sleeps) == 1
+
+
+def test_retry_create_retries_unreachable_server_quickly(sleeps):
+    create = failing(URLError("refused"), URLError("refused"), WebDriverException("busy"))
+
+    assert webdriver_kaifuku._retry_create(create, attempts=4, base=0.5, quick=0.2) == "browser"
+    assert sleeps == [0.2, 0.2, 2.0 + 0.5]
+
+
+def test_retry_create_retries_connection_reset(sleeps):
+    create = failing(ConnectionResetError())
+
+    assert webdriver_kaifuku._retry_create(create) == "browser"
+    assert len(sleeps) == 1
+
+
+def test_retry_create_does_not_retry_other_errors(sleeps):
+    with pytest.raises(KeyError):
+        webdriver_kaifuku._retry_create(failing(KeyError("options")))
+    assert sleeps == []
+
+
+def test_retry_create_needs_an_attempt():
+    with pytest.raises(ValueError):
+        webdriver_kaifuku._retry_create(failing(), attempts=0)
+
+
+def test_create_reports_refused_connection(sleeps):
+    def refused(**kwargs):
+        raise URLError(ConnectionRefusedError(111, "Connection refused"))
+
+    with pytest.raises(RuntimeError, match="Is it up and running"):
+        BrowserFactory(refused, {}).create()
+
+
+def test_retry_create_stops_at_budget(monkeypatch, sleeps):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(time, "sleep", lambda delay: now.__setitem__(0, now[0] + delay))
+    create = failing(*[WebDriverException("busy")] * 5)
+
+    with pytest.raises(WebDriverException):
+        webdriver_kaifuku._retry_create(create, attempts=10, base=1.0, cap=8.0, budget=9)
+    # slept 1 + 1 and 2 + 1, the next 4 + 1 would have overrun the budget
+    assert now[0] == 105.0
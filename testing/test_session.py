@@ -18,7 +18,7 @@ def test_open_close(test_data: tuple[BrowserManager, str]):
 def test_session(test_data: tuple[BrowserManager, str], selenium_container: str):
     manager, browser_name = test_data
     driver = manager.ensure_open()
-    r = requests.get("http://localhost:4444/status")
+    r = requests.get("http://localhost:4444/status", timeout=(2, 5))
     assert r.ok
     assert driver.caps["acceptInsecureCerts"] is True
     assert driver.caps["browserName"] == browser_name
@@ -40,7 +40,6 @@ def test_session(test_data: tuple[BrowserManager, str], selenium_container: str)
             [
                 "podman",
                 "exec",
-                "-it",
                 selenium_container,
                 "bash",
                 "-c",
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+
+import pytest
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver import ChromeOptions
+from webdriver_kaifuku import BrowserFactory
+from webdriver_kaifuku import BrowserManager
+
+GRID = "http://grid.example.com:4444"
+
+
+class FakeRemote:
+    started = 0
+    alive = True
+
+    def __init__(self, command_executor=None, options=None, **kwargs):
+        self.command_executor = command_executor
+        self.quit_called = False
+        self.start_session({"browserName": "chrome"})
+
+    def start_session(self, capabilities):
+        FakeRemote.started += 1
+        self.session_id = f"session-{FakeRemote.started}"
+        self.caps = capabilities
+
+    @property
+    def current_url(self):
+        if not FakeRemote.alive:
+            raise WebDriverException("invalid session id")
+        return "about:blank"
+
+    def maximize_window(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture(autouse=True)
+def fake_remote(monkeypatch, tmp_path):
+    monkeypatch.setattr(webdriver, "Remote", FakeRemote)
+    monkeypatch.setattr(FakeRemote, "started", 0)
+    monkeypatch.setattr(FakeRemote, "alive", True)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.setenv("WDK_REUSE_SESSION", "1")
+
+
+def make_factory(command_executor=GRID):
+    return BrowserFactory(
+        FakeRemote, {"command_executor": command_executor, "options": ChromeOptions()}
+    )
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def hand_over(path):
+    # pretend the run that saved the session has exited
+    session = json.loads(path.read_text())
+    session["owner_pid"] = dead_pid()
+    path.write_text(json.dumps(session))
+
+
+def test_save_session_is_private(tmp_path):
+    make_factory().save_session(FakeRemote())
+
+    path = tmp_path / "wdk_session.json"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert json.loads(path.read_text())["session_id"] == "session-1"
+    assert [p.name for p in tmp_path.iterdir()] == ["wdk_session.json"]
+
+
+def test_save_session_cleans_up_after_failure(tmp_path):
+    browser = FakeRemote()
+    browser.caps = {"unserializable": object()}
+
+    make_factory().save_session(browser)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_session_falls_back_to_tempdir(monkeypatch, tmp_path):
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    make_factory().save_session(FakeRemote())
+
+    assert stat.S_IMODE((tmp_path / "wdk_session.json").stat().st_mode) == 0o600
+
+
+def test_no_reattach_to_session_of_this_process():
+    first = BrowserManager(make_factory()).open_fresh()
+    second = BrowserManager(make_factory()).open_fresh()
+
+    assert first.session_id != second.session_id
+
+
+def test_reattach_claims_session_of_exited_owner(tmp_path):
+    path = tmp_path / "wdk_session.json"
+    make_factory().save_session(FakeRemote())
+    hand_over(path)
+
+    browser = make_factory().reattach()
+
+    assert isinstance(browser, FakeRemote)
+    assert browser.session_id == "session-1"
+    assert not path.exists()
+    assert make_factory().reattach() is None
+
+
+def test_open_fresh_takes_over_saved_session(tmp_path):
+    path = tmp_path / "wdk_session.json"
+    make_factory().save_session(FakeRemote())
+    hand_over(path)
+
+    browser = BrowserManager(make_factory()).open_fresh()
+
+    assert browser.session_id == "session-1"
+    assert json.loads(path.read_text())["owner_pid"] == os.getpid()
+
+
+def test_reattach_skips_other_grid(tmp_path):
+    path = tmp_path / "wdk_session.json"
+    make_factory().save_session(FakeRemote())
+    hand_over(path)
+
+    assert make_factory("http://other.example.com:4444").reattach() is None
+    assert path.exists()
+
+
+def test_dead_session_starts_new_browser(tmp_path):
+    make_factory().save_session(FakeRemote())
+    hand_over(tmp_path / "wdk_session.json")
+    FakeRemote.alive = False
+
+    assert make_factory().reattach() is None
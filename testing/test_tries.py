@@ -0,0 +1,28 @@
+import pytest
+from webdriver_kaifuku.tries import tries
+from webdriver_kaifuku.tries import TriesExceeded
+
+
+def test_tries_returns_after_retry():
+    calls = []
+
+    def flaky():
+        calls.append(None)
+        if len(calls) < 2:
+            raise ValueError
+        return "ok"
+
+    assert tries(3, ValueError, flaky) == "ok"
+    assert len(calls) == 2
+
+
+def test_tries_reraises_last_exception():
+    errors = iter([ValueError("first"), ValueError("last")])
+
+    def failing():
+        raise next(errors)
+
+    with pytest.raises(ValueError, match="last"):
+        tries(2, ValueError, failing)
+    with pytest.raises(TriesExceeded):
+        tries(0, ValueError, failing)